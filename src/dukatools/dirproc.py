@@ -1,40 +1,111 @@
 from __future__ import annotations
 import os
 import re
+import sys
 from pathlib import Path
 from argparse import ArgumentParser, Namespace
-from typing import Iterable, List, Set, Optional
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Deque, Iterable, Iterator, List, Set, Optional, Tuple, TypeVar
 
 
-def detect_encoding(file_path: str) -> str:
+T = TypeVar("T")
+
+
+# Сколько байт отдаём детектору кодировки: для ответа хватает начала файла
+DETECT_SAMPLE_SIZE = 64 * 1024
+
+# Размер буфера чтения файлов (не зависит от io.DEFAULT_BUFFER_SIZE)
+READ_BUFFER_SIZE = 128 * 1024
+
+# Порог, при котором накопленный вывод сбрасывается в --output-file
+OUTPUT_FLUSH_SIZE = 4 * 1024 * 1024
+
+_BOMS = (
+    (b"\xef\xbb\xbf", "utf-8-sig"),
+    (b"\xff\xfe\x00\x00", "utf-32"),
+    (b"\x00\x00\xfe\xff", "utf-32"),
+    (b"\xff\xfe", "utf-16"),
+    (b"\xfe\xff", "utf-16"),
+)
+
+
+@lru_cache(maxsize=1)
+def _charset_detector() -> Callable[[bytes], Optional[str]]:
+    # cchardet — тот же алгоритм, что у chardet (uchardet), но на C.
+    # charset_normalizer только как запасной вариант: на коротких файлах он
+    # заметно чаще ошибается (например, принимает latin-1 за UTF-16).
+    try:
+        import cchardet
+
+        return lambda sample: cchardet.detect(sample).get("encoding")
+    except ImportError:
+        pass
+
     try:
         import chardet
+
+        return lambda sample: chardet.detect(sample).get("encoding")
+    except ImportError:
+        pass
+
+    try:
+        import charset_normalizer
     except ModuleNotFoundError:
         print("chardet is necessary. Make an uodate: uv tool upgrade dukatools", flush=True)
         raise
 
+    def detect(sample: bytes) -> Optional[str]:
+        best = charset_normalizer.from_bytes(sample).best()
+        return best.encoding if best else None
+
+    return detect
+
+
+def detect_encoding_bytes(sample: bytes) -> str:
+    # BOM однозначно задаёт кодировку — chardet не нужен
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    return _charset_detector()(sample[:DETECT_SAMPLE_SIZE]) or "latin1"
+
+
+def detect_encoding(file_path: str) -> str:
     with open(file_path, "rb") as file:
-        raw_data = file.read()
-        result = chardet.detect(raw_data)
-        return result.get("encoding") or "latin1"
+        return detect_encoding_bytes(file.read(DETECT_SAMPLE_SIZE))
 
 
 def compile_patterns(patterns: Iterable[str]) -> List[re.Pattern]:
+    patterns = list(patterns)
     compiled = []
+    # Компилируем по одному — только ради понятной ошибки на конкретном паттерне
     for pat in patterns:
         try:
             compiled.append(re.compile(pat))
         except re.error as e:
             raise SystemExit(f"Invalid regex in --exclude-pattern: {pat!r} -> {e}")
-    return compiled
 
+    # Одна альтернация вместо P вызовов search на каждый путь. Группы в
+    # паттернах после первого сдвинули бы нумерацию (\1, (?(1)...)), а
+    # инлайн-флаги вроде (?i) распространились бы на всю альтернацию — в этих
+    # случаях остаёмся на списке.
+    if len(compiled) < 2 or any(rx.groups for rx in compiled[1:]) or any(rx.flags != re.UNICODE for rx in compiled):
+        return compiled
+    try:
+        return [re.compile("|".join(f"(?:{pat})" for pat in patterns))]
+    except re.error:
+        return compiled
 
-def should_exclude(path: Path, rel_posix: str, exclude_names: Set[str], exclude_regex: List[re.Pattern]) -> bool:
+
+def should_exclude(name: str, rel_posix: str, exclude_names: Set[str], exclude_regex: List[re.Pattern]) -> bool:
     # Точное совпадение имени (базовое имя, без пути)
-    if path.name in exclude_names:
+    if name in exclude_names:
         return True
 
     # Соответствие любому из regex по относительному POSIX-пути
+    # (обычно это одна объединённая альтернация из compile_patterns)
     for rx in exclude_regex:
         if rx.search(rel_posix):
             return True
@@ -42,51 +113,207 @@ def should_exclude(path: Path, rel_posix: str, exclude_names: Set[str], exclude_
     return False
 
 
+def scan_directory(
+    root_dir: Path,
+    current_rel_posix: str,
+    exclude_names: Set[str],
+    exclude_regex: List[re.Pattern],
+) -> List[Tuple[str, str, str]]:
+    # Список (kind, rel_posix, path) в порядке scandir; kind = "dir" | "file".
+    # Только строки из DirEntry: без Path на каждую запись, тип берётся из d_type.
+    prefix = "" if current_rel_posix == "." else current_rel_posix + "/"
+    items: List[Tuple[str, str, str]] = []
+    with os.scandir(root_dir / current_rel_posix) as it:
+        for entry in it:
+            name = entry.name
+            rel_posix = prefix + name
+
+            if should_exclude(name, rel_posix, exclude_names, exclude_regex):
+                # Если это директория — не заходим внутрь
+                continue
+
+            # Без d_type (часть NFS/FUSE) is_dir делает один lstat, результат
+            # кешируется в DirEntry — is_file ниже его переиспользует. Пакетных
+            # stat (getattrlistbulk, io_uring statx) в stdlib нет; задержку этих
+            # lstat перекрывает пул --jobs, сканирующий директории параллельно.
+            if entry.is_dir(follow_symlinks=False):
+                items.append(("dir", rel_posix, entry.path))
+            elif entry.is_file(follow_symlinks=False):
+                items.append(("file", rel_posix, entry.path))
+    return items
+
+
+def _read_bytes(path: str) -> bytes:
+    # O_NOATIME: не обновляем atime на каждом прочитанном файле (Linux);
+    # ядро отказывает (EPERM), если файл чужой — тогда открываем без него
+    flags = os.O_RDONLY | getattr(os, "O_BINARY", 0) | getattr(os, "O_CLOEXEC", 0)
+    noatime = getattr(os, "O_NOATIME", 0)
+    try:
+        fd = os.open(path, flags | noatime)
+    except PermissionError:
+        if not noatime:
+            raise
+        fd = os.open(path, flags)
+    with os.fdopen(fd, "rb", buffering=READ_BUFFER_SIZE) as f:
+        return f.read()
+
+
+def _decode(raw: bytes) -> str:
+    # Кодировка выбирается по первым DETECT_SAMPLE_SIZE байтам, но проверяется на
+    # всём буфере: ASCII-начало не должно превращать UTF-8/cp1252-хвост в U+FFFD.
+    encoding = detect_encoding_bytes(raw)
+    if encoding.lower() == "ascii":
+        encoding = "utf-8"  # ASCII — подмножество UTF-8
+    try:
+        return raw.decode(encoding)
+    except UnicodeDecodeError:
+        # Выборка ошиблась — детект по всему файлу, как было до сэмплирования
+        return raw.decode(_charset_detector()(raw) or "latin1", errors="replace")
+
+
+def read_file(rel_posix: str, p: str) -> str:
+    result = f"File: {rel_posix}\n\n"
+    try:
+        # Один проход по файлу: детект по началу, декодирование всего буфера
+        raw = _read_bytes(p)
+        content = _decode(raw)
+        # Универсальные переводы строк, как было при open(..., "r")
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+        result += f"Content:\n{content}\n\n"
+    except Exception as e:
+        result += f"Error reading file {rel_posix}: {e}\n\n"
+    return result
+
+
+def _submit(pool: Optional[ThreadPoolExecutor], fn: Callable[..., T], *args) -> "Future[T]":
+    # Без пула (--jobs 1) выполняем сразу, но сохраняем интерфейс Future
+    if pool is not None:
+        return pool.submit(fn, *args)
+    fut: "Future[T]" = Future()
+    try:
+        fut.set_result(fn(*args))
+    except BaseException as e:
+        fut.set_exception(e)
+    return fut
+
+
+def _schedule(
+    root_dir: Path,
+    scanned: "Future[List[Tuple[str, str, str]]]",
+    recursive: bool,
+    exclude_names: Set[str],
+    exclude_regex: List[re.Pattern],
+    dir_pool: Optional[ThreadPoolExecutor],
+    file_pool: Optional[ThreadPoolExecutor],
+    window: int,
+) -> Iterator[Tuple[str, str, Future]]:
+    # result() здесь, а не в генераторе — FileNotFoundError должен всплыть сразу
+    return _read_ahead(
+        scanned.result(), root_dir, recursive, exclude_names, exclude_regex, dir_pool, file_pool, window
+    )
+
+
+def _read_ahead(
+    items: List[Tuple[str, str, str]],
+    root_dir: Path,
+    recursive: bool,
+    exclude_names: Set[str],
+    exclude_regex: List[re.Pattern],
+    dir_pool: Optional[ThreadPoolExecutor],
+    file_pool: Optional[ThreadPoolExecutor],
+    window: int,
+) -> Iterator[Tuple[str, str, Future]]:
+    # Чтение файлов и обход поддиректорий ставятся в очередь заранее, но не
+    # больше window задач: следующая отправляется, когда основной (единственный
+    # пишущий) поток забирает результат. Иначе все прочитанные файлы директории
+    # копились бы в памяти до записи.
+    pending: Deque[Tuple[str, str, Future]] = deque()
+    it = iter(items)
+    while True:
+        while len(pending) < window:
+            item = next(it, None)
+            if item is None:
+                break
+            kind, rel_posix, p = item
+            if kind == "file":
+                pending.append((kind, rel_posix, _submit(file_pool, read_file, rel_posix, p)))
+            elif recursive:
+                pending.append(
+                    (kind, rel_posix, _submit(dir_pool, scan_directory, root_dir, rel_posix, exclude_names, exclude_regex))
+                )
+        if not pending:
+            return
+        yield pending.popleft()
+
+
 def process_directory(
     root_dir: Path,
     current_rel: Path,
-    out_fh,  # текстовый файл или None (stdout)
+    out_fh,  # бинарный файл (пишем UTF-8) или None (stdout)
     recursive: bool,
     exclude_names: Set[str],
     exclude_regex: List[re.Pattern],
+    jobs: int = 1,
 ) -> None:
-    base = root_dir / current_rel
+    # Вывод в файл копится в bytearray и сбрасывается пачками по OUTPUT_FLUSH_SIZE:
+    # один encode на файл и редкие write вместо write на каждый файл
+    buf = bytearray()
+
+    def emit(text: str) -> None:
+        if not out_fh:
+            sys.stdout.write(text)
+            return
+        if os.linesep != "\n":
+            text = text.replace("\n", os.linesep)
+        buf.extend(text.encode("utf-8"))
+        if len(buf) >= OUTPUT_FLUSH_SIZE:
+            out_fh.write(buf)
+            buf.clear()
+
+    # jobs > 1: обход директорий и чтение файлов в пулах потоков (I/O-bound),
+    # порядок вывода остаётся тем же, что и при последовательном обходе
+    dir_pool = ThreadPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    file_pool = ThreadPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    # Сколько задач на директорию может быть в работе/в памяти одновременно
+    window = 2 * max(1, jobs)
+
+    # Явный стек итераторов вместо рекурсии: обход в глубину в том же
+    # порядке, без лимита рекурсии на глубоких деревьях
+    stack: Deque[Iterator[Tuple[str, str, Future]]] = deque()
+
+    def enter(rel_posix: str, scanned: Future) -> None:
+        try:
+            children = _schedule(root_dir, scanned, recursive, exclude_names, exclude_regex, dir_pool, file_pool, window)
+            stack.append(children)
+        except FileNotFoundError:
+            emit(f"Path not found: {root_dir / rel_posix}\n")
+
     try:
-        entries = list(os.scandir(base))
-    except FileNotFoundError:
-        msg = f"Path not found: {base}"
-        if out_fh:
-            print(msg, file=out_fh)
-        else:
-            print(msg)
-        return
-
-    for entry in entries:
-        p = Path(entry.path)
-        rel = current_rel / entry.name
-        rel_posix = rel.as_posix()
-
-        if should_exclude(p, rel_posix, exclude_names, exclude_regex):
-            # Если это директория — не заходим внутрь
-            continue
-
-        if entry.is_dir(follow_symlinks=False):
-            if recursive:
-                process_directory(root_dir, rel, out_fh, recursive, exclude_names, exclude_regex)
-        elif entry.is_file(follow_symlinks=False):
-            result = f"File: {rel_posix}\n\n"
-            try:
-                encoding = detect_encoding(str(p))
-                with open(p, "r", encoding=encoding, errors="replace") as f:
-                    content = f.read()
-                result += f"Content:\n{content}\n\n"
-            except Exception as e:
-                result += f"Error reading file {rel_posix}: {e}\n\n"
-
-            if out_fh:
-                out_fh.write(result)
-            else:
-                print(result)
+        current_rel_posix = current_rel.as_posix()
+        enter(
+            current_rel_posix,
+            _submit(dir_pool, scan_directory, root_dir, current_rel_posix, exclude_names, exclude_regex),
+        )
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                continue
+
+            kind, rel_posix, fut = item
+            if kind == "dir":
+                enter(rel_posix, fut)
+                continue
+
+            # В stdout — как раньше через print, с дополнительной пустой строкой
+            result = fut.result()
+            emit(result if out_fh else result + "\n")
+    finally:
+        if out_fh and buf:
+            out_fh.write(buf)
+        for pool in (dir_pool, file_pool):
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
 
 
 def main() -> None:
@@ -106,6 +333,13 @@ def main() -> None:
         default=[],
         help="Exclude by regex applied to relative POSIX path. Can be repeated.",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=min(32, (os.cpu_count() or 1) * 4),
+        help="Parallel I/O workers for directory scans and file reads (1 = sequential).",
+    )
 
     args: Namespace = parser.parse_args()
 
@@ -121,7 +355,7 @@ def main() -> None:
         if args.output_file:
             out_path = Path(args.output_file)
             out_path.parent.mkdir(parents=True, exist_ok=True)
-            out_fh = open(out_path, "w", encoding="utf-8")
+            out_fh = open(out_path, "wb")
 
         process_directory(
             root_dir=root_dir,
@@ -130,6 +364,7 @@ def main() -> None:
             recursive=not args.non_recursive,
             exclude_names=exclude_names,
             exclude_regex=exclude_regex,
+            jobs=args.jobs,
         )
     finally:
         if out_fh:
@@ -6,13 +6,22 @@ Env:
 
 Notes:
   - Default variant: install_only_stripped (compact; .tar.gz)
-  - On Linux, musl vs glibc is auto-detected (ldd or /etc/alpine-release).
+  - On Linux, musl vs glibc is auto-detected (ldd or /etc/alpine-release);
+    the result is cached for a week in ~/.cache/dukatools/platform.json.
   - .tar.zst archives (rare here) require external `tar` for extraction.
+  - .tar.gz/.tar.xz are extracted with the system `tar` when present (faster),
+    falling back to the stdlib tarfile module (always on Windows).
+  - With --extract, .tar.gz/.tar.xz assets are extracted while downloading
+    (no archive is kept on disk); other formats are saved first.
+  - Release metadata is cached for 15 minutes in ~/.cache/dukatools and then
+    revalidated with ETag; pass --no-cache to always query the API.
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
+import http.client
 import json
 import os
 import platform
@@ -21,19 +30,57 @@ import shutil
 import subprocess
 import sys
 import tarfile
+import time
 import urllib.error
 import urllib.request
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 
 API_DEFAULT = "https://api.github.com/repos/astral-sh/python-build-standalone/releases/latest"
 
+# Chunk size for streaming asset downloads (shutil's default is 64 KiB)
+COPY_BUFSIZE = 1 << 20
+
+# Detected libc per host (musl/gnu), re-probed after a week
+PLATFORM_CACHE = "platform.json"
+PLATFORM_CACHE_TTL = 7 * 24 * 3600
+
+# Release metadata cache (keyed by API URL); revalidated with ETag once stale.
+# Per-user cache dir, not the shared temp dir: its content picks the URL we download.
+RELEASE_CACHE = "release.json"
+RELEASE_CACHE_TTL = 15 * 60
+
 
 def log(msg: str) -> None:
     print(msg, flush=True)
 
 
+def _cache_path(name: str) -> Optional[Path]:
+    # Resolved lazily: Path.home() raises RuntimeError without HOME and a passwd
+    # entry (minimal / arbitrary-UID containers) -> caching is simply disabled
+    base = os.environ.get("XDG_CACHE_HOME")
+    if not base:
+        try:
+            base = Path.home() / ".cache"
+        except RuntimeError:
+            return None
+    return Path(base) / "dukatools" / name
+
+
+def _write_cache(path: Path, data: Dict[str, Any]) -> None:
+    # Best effort: a broken cache must never break the download itself
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+@lru_cache(maxsize=1)
 def detect_triplet() -> str:
     sysname = platform.system()
     mach = platform.machine().lower()
@@ -59,7 +106,7 @@ def detect_triplet() -> str:
         raise SystemExit(f"Unsupported OS: {sysname}")
 
 
-def detect_libc() -> str:
+def _probe_libc() -> str:
     # Try to detect musl vs glibc
     try:
         out = subprocess.check_output(["ldd", "--version"], stderr=subprocess.STDOUT, text=True)
@@ -74,26 +121,100 @@ def detect_libc() -> str:
         return "gnu"
 
 
-def http_get(url: str, headers: Optional[Dict[str, str]] = None) -> bytes:
-    req = urllib.request.Request(url, headers=headers or {})
-    with urllib.request.urlopen(req) as resp:
-        return resp.read()
+@lru_cache(maxsize=1)
+def detect_libc() -> str:
+    # `ldd --version` is a fork+exec per run; the answer is cached on disk per host
+    path = _cache_path(PLATFORM_CACHE)
+    if path is None:
+        return _probe_libc()
+    key = f"{platform.node()}:{platform.machine()}"
+    try:
+        cache = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        cache = {}
+    if not isinstance(cache, dict):
+        cache = {}
+    entry = cache.get(key)
+    if (
+        isinstance(entry, dict)
+        and entry.get("libc") in ("gnu", "musl")
+        and isinstance(entry.get("checked_at"), (int, float))
+        and 0 <= time.time() - entry["checked_at"] < PLATFORM_CACHE_TTL
+    ):
+        return entry["libc"]
+
+    libc = _probe_libc()
+    cache[key] = {"libc": libc, "checked_at": time.time()}
+    _write_cache(path, cache)
+    return libc
+
+
+def _load_release_cache(api_url: str) -> Optional[Dict[str, Any]]:
+    path = _cache_path(RELEASE_CACHE)
+    if path is None:
+        return None
+    try:
+        cache = json.loads(path.read_text(encoding="utf-8"))
+        entry = cache.get(api_url)
+        if (
+            isinstance(entry, dict)
+            and isinstance(entry.get("body"), dict)
+            and isinstance(entry.get("fetched_at"), (int, float))
+        ):
+            return entry
+    except (OSError, ValueError, AttributeError):
+        pass
+    return None
+
 
+def _save_release_cache(api_url: str, entry: Dict[str, Any]) -> None:
+    path = _cache_path(RELEASE_CACHE)
+    if path is None:
+        return
+    try:
+        cache = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(cache, dict):
+            cache = {}
+    except (OSError, ValueError):
+        cache = {}
+    cache[api_url] = entry
+    _write_cache(path, cache)
+
+
+def fetch_latest_release(api_url: str, token: Optional[str], use_cache: bool = True) -> Dict[str, Any]:
+    cached = _load_release_cache(api_url) if use_cache else None
+    now = time.time()
+    # Lower bound too: a fetched_at in the future (clock skew) must not pin a stale entry
+    if cached and 0 <= now - cached["fetched_at"] < RELEASE_CACHE_TTL:
+        return cached["body"]
 
-def fetch_latest_release(api_url: str, token: Optional[str]) -> Dict[str, Any]:
     headers = {
         "Accept": "application/vnd.github+json",
         "User-Agent": "pbs-install/1.0",
     }
     if token:
         headers["Authorization"] = f"Bearer {token}"
+    if cached and cached.get("etag"):
+        # Conditional request: 304 costs no rate limit and carries no body
+        headers["If-None-Match"] = cached["etag"]
     try:
-        data = http_get(api_url, headers=headers)
+        req = urllib.request.Request(api_url, headers=headers)
+        with urllib.request.urlopen(req) as resp:
+            data = resp.read()
+            etag = resp.headers.get("ETag")
     except urllib.error.HTTPError as e:
+        if e.code == 304 and cached:
+            cached["fetched_at"] = now
+            _save_release_cache(api_url, cached)
+            return cached["body"]
         raise SystemExit(f"GitHub API error: {e.code} {e.reason}")
     except urllib.error.URLError as e:
         raise SystemExit(f"Network error: {e.reason}")
-    return json.loads(data.decode("utf-8"))
+
+    release = json.loads(data.decode("utf-8"))
+    if use_cache:
+        _save_release_cache(api_url, {"fetched_at": now, "etag": etag, "body": release})
+    return release
 
 
 _version_re = re.compile(r"^cpython-(\d+\.\d+(?:\.\d+)?)")
@@ -107,13 +228,6 @@ def parse_version_from_name(name: str) -> Optional[Tuple[int, ...]]:
     return parts
 
 
-def version_key_tuple(name: str) -> Tuple[int, ...]:
-    v = parse_version_from_name(name)
-    if v is None:
-        return (0,)
-    return v
-
-
 def select_asset(
     release: Dict[str, Any],
     triplet: str,
@@ -121,19 +235,22 @@ def select_asset(
     want_version: Optional[str],
 ) -> Dict[str, Any]:
     assets: List[Dict[str, Any]] = release.get("assets", [])
-    # base filter
-    cands = [
-        a for a in assets
-        if a.get("name", "").startswith("cpython-")
-        and triplet in a.get("name", "")
-        and variant in a.get("name", "")
-    ]
-
-    if want_version:
-        # allow "3.12" or "3.12.12"
-        # match: cpython-<want>(.|t|+)
-        pattern = re.compile(rf"^cpython-{re.escape(want_version)}(\.|t|\+)")
-        cands = [a for a in cands if pattern.search(a.get("name", ""))]
+    # One match per asset: captures the version and checks triplet/variant
+    # presence (lookaheads keep the old order-independent substring semantics)
+    filt = re.compile(
+        rf"^cpython-(\d+\.\d+(?:\.\d+)?)(?=.*{re.escape(triplet)})(?=.*{re.escape(variant)})",
+        re.DOTALL,
+    )
+    # allow "3.12" or "3.12.12"
+    # match: cpython-<want>(.|t|+)
+    want = re.compile(rf"^cpython-{re.escape(want_version)}(\.|t|\+)") if want_version else None
+
+    cands: List[Tuple[Tuple[int, ...], Dict[str, Any]]] = []
+    for a in assets:
+        name = a.get("name", "")
+        m = filt.match(name)
+        if m and (want is None or want.match(name)):
+            cands.append((tuple(int(p) for p in m.group(1).split(".")), a))
 
     if not cands:
         raise SystemExit(
@@ -141,26 +258,113 @@ def select_asset(
         )
 
     # Sort by semantic version and pick the highest
-    cands.sort(key=lambda a: version_key_tuple(a.get("name", "")))
-    return cands[-1]
+    cands.sort(key=lambda c: c[0])
+    return cands[-1][1]
+
+
+class _HashingReader:
+    """Read-through wrapper that feeds every chunk into a SHA-256."""
+
+    def __init__(self, fileobj: Any) -> None:
+        self._fileobj = fileobj
+        self.sha256 = hashlib.sha256()
 
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._fileobj.read(size)
+        self.sha256.update(chunk)
+        return chunk
 
-def download(url: str, out_path: Path, token: Optional[str]) -> None:
+
+def _open_asset(url: str, token: Optional[str]) -> Any:
     headers = {"User-Agent": "pbs-install/1.0"}
     if token:
         headers["Authorization"] = f"Bearer {token}"
-    # Stream to file
-    req = urllib.request.Request(url, headers=headers)
-    with urllib.request.urlopen(req) as resp, open(out_path, "wb") as f:
-        shutil.copyfileobj(resp, f)
+    return urllib.request.urlopen(urllib.request.Request(url, headers=headers))
+
+
+def download(url: str, out_path: Path, token: Optional[str]) -> str:
+    # Stream to file; returns SHA-256 hex digest computed on the fly
+    with _open_asset(url, token) as resp, open(out_path, "wb") as f:
+        reader = _HashingReader(resp)
+        shutil.copyfileobj(reader, f, COPY_BUFSIZE)
+    return reader.sha256.hexdigest()
+
+
+def is_streamable(name: str) -> bool:
+    # Formats tarfile can extract sequentially straight from the HTTP body
+    return name.lower().endswith((".tar.gz", ".tgz", ".tar.xz"))
+
+
+def system_tar() -> Optional[str]:
+    # External tar unpacks in C, without per-member Python work. Skipped on
+    # Windows: a GNU tar from Git/MSYS would read "C:/..." as a remote host.
+    if os.name == "nt":
+        return None
+    return shutil.which("tar")
+
+
+def _tar_compression_flag(name: str) -> str:
+    # Explicit -z/-J: GNU tar cannot auto-detect compression on a pipe
+    return "J" if name.lower().endswith(".tar.xz") else "z"
+
+
+def download_and_extract(url: str, target_dir: Path, token: Optional[str]) -> str:
+    # Single pass: HTTP body -> tar stream -> target_dir, no archive on disk
+    target_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        return _stream_extract(url, target_dir, token)
+    except (OSError, http.client.HTTPException, tarfile.TarError, EOFError, KeyboardInterrupt) as e:
+        reason = "interrupted" if isinstance(e, KeyboardInterrupt) else f"{type(e).__name__}: {e}"
+        raise SystemExit(
+            f"Streaming download/extraction failed ({reason}). "
+            f"{target_dir} may be partially extracted; remove it and re-run."
+        )
+
+
+def _stream_extract(url: str, target_dir: Path, token: Optional[str]) -> str:
+    tar = system_tar()
+    with _open_asset(url, token) as resp:
+        reader = _HashingReader(resp)
+        if tar:
+            flag = _tar_compression_flag(url.rsplit("/", 1)[-1])
+            proc = subprocess.Popen([tar, f"-x{flag}f", "-", "-C", str(target_dir)], stdin=subprocess.PIPE)
+            try:
+                try:
+                    shutil.copyfileobj(reader, proc.stdin, COPY_BUFSIZE)
+                except BrokenPipeError:
+                    pass  # tar exited early; its return code says why
+                finally:
+                    try:
+                        proc.stdin.close()
+                    except BrokenPipeError:
+                        pass
+                rc = proc.wait()
+            finally:
+                # Download failed midway (or Ctrl-C): don't leave tar running/unreaped
+                if proc.poll() is None:
+                    proc.kill()
+                    proc.wait()
+            if rc != 0:
+                raise SystemExit(f"tar failed to extract the download stream (rc={rc})")
+        else:
+            with tarfile.open(fileobj=reader, mode="r|*", bufsize=COPY_BUFSIZE) as tf:
+                tf.extractall(target_dir)
+            # Drain the tail (tar end-of-archive padding) so the digest covers the whole file
+            while reader.read(COPY_BUFSIZE):
+                pass
+    return reader.sha256.hexdigest()
 
 
 def safe_extract(archive: Path, target_dir: Path) -> None:
     target_dir.mkdir(parents=True, exist_ok=True)
     name = archive.name.lower()
     if name.endswith((".tar.gz", ".tgz", ".tar.xz")):
-        with tarfile.open(archive, mode="r:*") as tf:
-            tf.extractall(target_dir)
+        tar = system_tar()
+        if tar:
+            subprocess.check_call([tar, f"-x{_tar_compression_flag(name)}f", str(archive), "-C", str(target_dir)])
+        else:
+            with tarfile.open(archive, mode="r:*") as tf:
+                tf.extractall(target_dir)
     elif name.endswith(".zip"):
         import zipfile
         with zipfile.ZipFile(archive) as zf:
@@ -204,6 +408,7 @@ def main() -> None:
     ap.add_argument("--extract", action="store_true", help="Extract archive after download")
     ap.add_argument("--api", default=API_DEFAULT, help="Releases API URL (default: latest release endpoint)")
     ap.add_argument("--triplet", default="", help="Override platform triplet (advanced)")
+    ap.add_argument("--no-cache", action="store_true", help="Do not read or write the cached release metadata")
     args = ap.parse_args()
 
     dest = Path(args.dest).expanduser().resolve()
@@ -217,7 +422,7 @@ def main() -> None:
     log(f"• Version: {args.version or 'latest'}")
     log("• Querying GitHub releases...")
 
-    release = fetch_latest_release(args.api, token)
+    release = fetch_latest_release(args.api, token, use_cache=not args.no_cache)
     asset = select_asset(release, triplet, args.variant, args.version or None)
 
     name = asset["name"]
@@ -225,15 +430,22 @@ def main() -> None:
     ver = ".".join(map(str, parse_version_from_name(name) or [])) or "unknown"
 
     out_path = dest / name
+    target_dir = dest / ver
     log(f"• Selected: {name}  (Python {ver})")
-    log(f"• Downloading → {out_path}")
-    download(url, out_path, token)
-    log("• Download complete.")
+    if args.extract and is_streamable(name):
+        log(f"• Downloading and extracting → {target_dir}")
+        digest = download_and_extract(url, target_dir, token)
+        log("• Download complete.")
+    else:
+        log(f"• Downloading → {out_path}")
+        digest = download(url, out_path, token)
+        log("• Download complete.")
+        if args.extract:
+            log(f"• Extracting to {target_dir}")
+            safe_extract(out_path, target_dir)
+    log(f"• SHA256: {digest}")
 
     if args.extract:
-        target_dir = dest / ver
-        log(f"• Extracting to {target_dir}")
-        safe_extract(out_path, target_dir)
         pybin = try_find_installed_python(target_dir)
         if pybin:
             log(f"• Python installed at: {pybin}")
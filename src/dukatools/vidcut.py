@@ -1,7 +1,14 @@
 from __future__ import annotations
-import argparse, subprocess, sys, shutil, os, glob, math, re
+import argparse, subprocess, sys, shutil, os, glob, json, math, re
 from pathlib import Path
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+# All ffmpeg/ffprobe calls pass an argv list (shell=False). On POSIX, close_fds=False lets
+# subprocess use posix_spawn/vfork without a close-all-fds pass in the child; Python's own
+# fds are non-inheritable (PEP 446), so nothing leaks into ffmpeg.
+_SPAWN: dict = {"close_fds": False} if os.name == "posix" else {}
 
 def _fail(msg: str, code: int = 2) -> None:
     print(f"[vidcut] {msg}", file=sys.stderr); sys.exit(code)
@@ -48,7 +55,7 @@ def _probe_duration_via_ffmpeg(ffmpeg: str, path: Path) -> Optional[float]:
     # Parse stderr of `ffmpeg -i input`: Duration: HH:MM:SS.xx
     try:
         proc = subprocess.run([ffmpeg, "-hide_banner", "-i", str(path)],
-                              stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, **_SPAWN)
         m = re.search(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)", proc.stderr)
         if not m: return None
         h, mnt, s = int(m.group(1)), int(m.group(2)), float(m.group(3))
@@ -56,6 +63,83 @@ def _probe_duration_via_ffmpeg(ffmpeg: str, path: Path) -> Optional[float]:
     except Exception:
         return None
 
+# Durations persisted across runs, keyed by "<resolved path>|<mtime_ns>|<size>"
+_DURATION_CACHE_MAX = 4096
+_durations_dirty = False
+
+@lru_cache(maxsize=1)
+def _duration_cache_path() -> Optional[Path]:
+    # Lazy: Path.home() raises RuntimeError without HOME and a passwd entry -> no cache
+    base = os.environ.get("XDG_CACHE_HOME")
+    if not base:
+        try: base = Path.home() / ".cache"
+        except RuntimeError: return None
+    return Path(base) / "dukatools" / "vidcut_durations.json"
+
+@lru_cache(maxsize=1)
+def _durations() -> dict:
+    path = _duration_cache_path()
+    if path is None: return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def _save_duration_cache() -> None:
+    # Best effort; keeps only the most recent entries
+    path = _duration_cache_path()
+    if not _durations_dirty or path is None: return
+    items = list(_durations().items())[-_DURATION_CACHE_MAX:]
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(dict(items)), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+def _cached_duration(ffmpeg: str, path: Path) -> Optional[float]:
+    # Re-cutting the same unchanged file skips the probe subprocess entirely
+    global _durations_dirty
+    try:
+        st = path.stat(); key = f"{path.resolve()}|{st.st_mtime_ns}|{st.st_size}"
+    except OSError:
+        return _probe_duration(ffmpeg, path)
+    cache = _durations()
+    D = cache.get(key)
+    if isinstance(D, (int, float)): return float(D)
+    D = _probe_duration(ffmpeg, path)
+    if D is not None:
+        cache.pop(key, None); cache[key] = D; _durations_dirty = True
+    return D
+
+@lru_cache(maxsize=None)
+def _resolve_ffprobe(ffmpeg: str) -> Optional[str]:
+    # ffprobe next to the ffmpeg in use, else on PATH (imageio-ffmpeg ships ffmpeg only)
+    exe = "ffprobe.exe" if os.name == "nt" else "ffprobe"
+    sibling = Path(ffmpeg).with_name(exe)
+    if sibling.is_file(): return str(sibling)
+    return shutil.which("ffprobe")
+
+def _probe_duration_via_ffprobe(ffprobe: str, path: Path) -> Optional[float]:
+    # Reads only the container header: no codec init, a single float on stdout
+    try:
+        proc = subprocess.run([ffprobe, "-v", "error", "-show_entries", "format=duration",
+                               "-of", "default=noprint_wrappers=1:nokey=1", str(path)],
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, **_SPAWN)
+        if proc.returncode != 0: return None
+        return float(proc.stdout.strip())
+    except (OSError, ValueError):
+        return None
+
+def _probe_duration(ffmpeg: str, path: Path) -> Optional[float]:
+    ffprobe = _resolve_ffprobe(ffmpeg)
+    if ffprobe:
+        D = _probe_duration_via_ffprobe(ffprobe, path)
+        if D is not None: return D
+    return _probe_duration_via_ffmpeg(ffmpeg, path)
+
 def _build_fast_cmd(ffmpeg: str, inp: Path, outp: Path, start: Optional[float], dur: Optional[float], overwrite: bool) -> List[str]:
     # Fast stream-copy: -ss before -i, -t duration, -c copy, keep all streams
     cmd: List[str] = [ffmpeg, "-hide_banner"]
@@ -79,9 +163,14 @@ def _build_acc_cmd(ffmpeg: str, inp: Path, outp: Path, start: Optional[float], d
     cmd += [str(outp)]
     return cmd
 
-def _run(cmd: List[str]) -> int:
+def _run(cmd: List[str], log: Optional[List[Tuple[bool, str]]] = None) -> int:
+    # log is not None -> capture ffmpeg output into it (parallel jobs print it on completion)
     try:
-        return subprocess.run(cmd).returncode
+        if log is None: return subprocess.run(cmd, **_SPAWN).returncode
+        proc = subprocess.run(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, **_SPAWN)
+        out = proc.stdout.decode("utf-8", "replace").rstrip()
+        if out: log.append((True, out))
+        return proc.returncode
     except FileNotFoundError:
         return 127
 
@@ -89,15 +178,109 @@ def _derive_output(inp: Path, suffix: str) -> Path:
     return inp.with_name(inp.stem + suffix + inp.suffix)
 
 def _expand_inputs(items: List[str]) -> List[Path]:
-    acc: List[Path] = []
+    # Single pass over a lazy glob; dedup on the string form of the Path (same equality as
+    # Path itself: "./x" == "x", but "a/../b" != "b" since a may be a symlink)
+    seen: set[str] = set(); out: List[Path] = []
     for it in items:
-        if any(ch in it for ch in "*?[]"): acc += [Path(p) for p in glob.glob(it)]
-        else: acc.append(Path(it))
-    seen = set(); out: List[Path] = []
-    for p in acc:
-        if p not in seen: seen.add(p); out.append(p)
+        matches = glob.iglob(it) if any(ch in it for ch in "*?[]") else (it,)
+        for m in matches:
+            p = Path(m); key = os.path.normcase(os.fspath(p))
+            if key not in seen: seen.add(key); out.append(p)
     return out
 
+def _process_one(ffmpeg: str, inp: Path, args: argparse.Namespace, cut: dict, capture: bool) -> Tuple[Optional[str], List[Tuple[bool, str]]]:
+    # Cut a single input. Returns (error, log) instead of exiting so it can run in a worker;
+    # with capture=False messages and ffmpeg output go straight to the terminal.
+    log: List[Tuple[bool, str]] = []
+    def say(msg: str, err: bool = False) -> None:
+        if capture: log.append((err, msg))
+        else: print(msg, file=sys.stderr if err else sys.stdout)
+    run_log = log if capture else None
+    start, to_abs, dur = cut["start"], cut["to_abs"], cut["dur"]
+    trim_start, trim_end = cut["trim_start"], cut["trim_end"]
+
+    if not inp.exists():
+        say(f"[vidcut] skip (not found): {inp}", err=True); return None, log
+
+    s = start if start is not None else 0.0
+    if trim_start: s = max(0.0, s + trim_start)
+
+    D = None
+    if to_abs is not None or trim_end is not None:
+        D = _cached_duration(ffmpeg, inp)
+        if D is None and trim_end is not None:
+            return f"Cannot detect duration for: {inp}", log
+
+    if to_abs is not None and to_abs >= 0: d = max(0.0, to_abs - s)
+    elif dur is not None: d = max(0.0, dur)
+    else: d = None
+
+    if trim_end is not None:
+        keep_to = max(0.0, (D or 0.0) - trim_end)
+        d = keep_to - s
+        if d < 0: return f"Trim range invalid for {inp.name}: start={_fmt_time(s)} > keep_to={_fmt_time(max(0.0, keep_to))}", log
+
+    outp = Path(args.out) if args.out else _derive_output(inp, args.suffix)
+
+    prefer_fast = not args.accurate or args.fast
+    if prefer_fast:
+        cmd = _build_fast_cmd(ffmpeg, inp, outp, s if s>0 else None, d, args.overwrite)
+        if args.dry_run: say(" ".join(cmd)); return None, log
+        rc = _run(cmd, run_log)
+        if rc != 0:
+            say(f"[vidcut] fast copy failed (rc={rc}), falling back to accurate…", err=True)
+            cmd2 = _build_acc_cmd(ffmpeg, inp, outp, s if s>0 else None, d, args.overwrite)
+            rc = _run(cmd2, run_log)
+            if rc != 0: return f"Accurate fallback failed for {inp.name} (rc={rc}).", log
+    else:
+        cmd = _build_acc_cmd(ffmpeg, inp, outp, s if s>0 else None, d, args.overwrite)
+        if args.dry_run: say(" ".join(cmd)); return None, log
+        rc = _run(cmd, run_log)
+        if rc != 0: return f"Accurate cut failed for {inp.name} (rc={rc}).", log
+
+    say(f"[vidcut] OK: {inp.name} -> {outp.name}")
+    return None, log
+
+def _run_batch(ffmpeg: str, inputs: List[Path], args: argparse.Namespace, cut: dict) -> None:
+    jobs = args.jobs or min(os.cpu_count() or 1, len(inputs))
+    if jobs <= 1 or len(inputs) == 1 or args.dry_run:
+        for inp in inputs:
+            err, _ = _process_one(ffmpeg, inp, args, cut, capture=False)
+            if err: _fail(err)
+        return
+
+    # ffmpeg runs in its own process, so threads are enough to keep N of them busy;
+    # each job's output is buffered and printed as a block when it finishes
+    # After the first failure, not-yet-started inputs are cancelled, but jobs already
+    # running are drained and reported so the user sees which outputs were written
+    def report(fut) -> Optional[str]:
+        err, log = fut.result()
+        for is_err, msg in log:
+            print(msg, file=sys.stderr if is_err else sys.stdout, flush=True)
+        return err
+
+    # Load the duration cache here, not lazily from the workers: lru_cache does not
+    # guarantee a single call under concurrency, and racing loaders lose entries
+    if cut["to_abs"] is not None or cut["trim_end"] is not None: _durations()
+
+    first_err: Optional[str] = None
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futs = [pool.submit(_process_one, ffmpeg, inp, args, cut, True) for inp in inputs]
+        rest = set(futs)
+        for fut in as_completed(futs):
+            rest.discard(fut)
+            first_err = report(fut)
+            if first_err: break
+        if first_err:
+            # Future.cancel() does not wake as_completed, so drain the rest explicitly
+            cancelled = sum(1 for f in futs if f in rest and f.cancel())
+            for f in futs:
+                if f in rest and not f.cancelled():
+                    err = report(f)
+                    if err: print(f"[vidcut] {err}", file=sys.stderr, flush=True)
+            if cancelled: print(f"[vidcut] {cancelled} input(s) not processed after the failure.", file=sys.stderr)
+    if first_err: _fail(first_err)
+
 def main():
     epilog = """
 EXAMPLES (all single-line):
@@ -120,6 +303,9 @@ EXAMPLES (all single-line):
   # Batch: all mp4, keep 15s clips with suffix _clip
   vidcut "*.mp4" --from 2m --duration 15s --suffix _clip --overwrite
 
+  # Batch with 4 ffmpeg processes in parallel
+  vidcut "*.mp4" --trim-start 3s --jobs 4 --overwrite
+
   # Inspect and cache ffmpeg that vidcut will use
   vidcut --doctor
 """
@@ -149,6 +335,7 @@ EXAMPLES (all single-line):
     p.add_argument("--dry-run", action="store_true", help="Print the ffmpeg command(s) and exit")
     p.add_argument("--ffmpeg", default=None, help="Override ffmpeg binary path/name")
     p.add_argument("--doctor", action="store_true", help="Show which ffmpeg is used and prefetch it")
+    p.add_argument("-j", "--jobs", type=int, default=None, help="Parallel ffmpeg runs for batches (default: min(CPUs, inputs))")
 
     args = p.parse_args()
 
@@ -173,48 +360,12 @@ EXAMPLES (all single-line):
     trim_start = _parse_time(args.trim_start) if args.trim_start else None
     trim_end = _parse_time(args.trim_end) if args.trim_end else None
 
-    for inp in inputs:
-        if not inp.exists():
-            print(f"[vidcut] skip (not found): {inp}", file=sys.stderr); continue
-
-        s = start if start is not None else 0.0
-        if trim_start: s = max(0.0, s + trim_start)
-
-        D = None
-        if to_abs is not None or trim_end is not None:
-            D = _probe_duration_via_ffmpeg(ffmpeg, inp)
-            if D is None and trim_end is not None:
-                _fail(f"Cannot detect duration for: {inp}")
-
-        if to_abs is not None and to_abs >= 0: d = max(0.0, to_abs - s)
-        elif dur is not None: d = max(0.0, dur)
-        else: d = None
-
-        if trim_end is not None:
-            keep_to = max(0.0, (D or 0.0) - trim_end)
-            d = keep_to - s
-            if d < 0: _fail(f"Trim range invalid for {inp.name}: start={_fmt_time(s)} > keep_to={_fmt_time(max(0.0, keep_to))}")
-
-        outp = Path(args.out) if args.out else _derive_output(inp, args.suffix)
-
-        prefer_fast = not args.accurate or args.fast
-        if prefer_fast:
-            cmd = _build_fast_cmd(ffmpeg, inp, outp, s if s>0 else None, d, args.overwrite)
-            if args.dry_run: print(" ".join(cmd)); continue
-            rc = _run(cmd)
-            if rc != 0:
-                print(f"[vidcut] fast copy failed (rc={rc}), falling back to accurate…", file=sys.stderr)
-                cmd2 = _build_acc_cmd(ffmpeg, inp, outp, s if s>0 else None, d, args.overwrite)
-                if args.dry_run: print(" ".join(cmd2)); continue
-                rc = _run(cmd2)
-                if rc != 0: _fail(f"Accurate fallback failed for {inp.name} (rc={rc}).")
-        else:
-            cmd = _build_acc_cmd(ffmpeg, inp, outp, s if s>0 else None, d, args.overwrite)
-            if args.dry_run: print(" ".join(cmd)); continue
-            rc = _run(cmd)
-            if rc != 0: _fail(f"Accurate cut failed for {inp.name} (rc={rc}).")
-
-        print(f"[vidcut] OK: {inp.name} -> {outp.name}")
+    cut = dict(start=start, to_abs=to_abs, dur=dur, trim_start=trim_start, trim_end=trim_end)
+
+    try:
+        _run_batch(ffmpeg, inputs, args, cut)
+    finally:
+        _save_duration_cache()
 
 if __name__ == "__main__":
     main()